@@ -1,10 +1,53 @@
 """Alertmanager webhook receiver for handling Prometheus alerts."""
 
+import orjson
 from aiohttp import web
-from typing import Dict, Any, List
+from typing import Dict, Any, Deque, List, Optional
 from loguru import logger
 from datetime import datetime
+from collections import deque
+from contextlib import suppress
 import asyncio
+import functools
+import html
+import time
+
+# (emoji, label) per alert status; anything not resolved is shown as firing
+ALERT_STATUS = {
+    'resolved': ("🟢", "RESOLVED"),
+    'firing': ("🔴", "FIRING"),
+}
+
+# Message sections in display order; unknown severities are shown as info
+SEVERITY_SECTIONS = (
+    ('critical', "🔴 <b>CRITICAL ALERTS</b>"),
+    ('warning', "🟡 <b>WARNING ALERTS</b>"),
+    ('info', "🔵 <b>INFO ALERTS</b>"),
+)
+
+
+@functools.lru_cache(maxsize=1024)
+def _format_alert_cached(alertname: str, instance: str, summary: str, status: Optional[str]) -> str:
+    """Format a single alert from its key fields.
+
+    Alerts that keep firing are formatted on every flush, so the result is
+    memoized on the fields that make up the message.
+
+    Args:
+        alertname: Alert name label
+        instance: Instance label
+        summary: Summary or description annotation
+        status: Alert status
+
+    Returns:
+        Formatted alert string
+    """
+    emoji, status_text = ALERT_STATUS.get(status, ALERT_STATUS['firing'])
+
+    # Label values are arbitrary text, escape them for Telegram's HTML mode
+    return f"{emoji} <b>{html.escape(alertname)}</b> [{status_text}]\n" \
+           f"   Instance: <code>{html.escape(instance)}</code>\n" \
+           f"   {html.escape(summary)}"
 
 
 class AlertReceiver:
@@ -22,9 +65,23 @@ class AlertReceiver:
         self.app = web.Application()
         self.app.router.add_post(config['path'], self.handle_alert)
 
-        # Alert aggregation
-        self.pending_alerts = []
-        self.aggregation_task = None
+        # Alert aggregation: flush when the batch is full or has waited long enough
+        self.max_batch_size = config.get('max_batch_size', 50)
+        self.max_queue_time = config.get('max_queue_time', 10)
+
+        # Bounded so a webhook flood drops the oldest alerts instead of exhausting memory
+        self.max_pending = config.get('max_pending', 10000)
+        self.pending_alerts: Deque[Dict[str, Any]] = deque(maxlen=self.max_pending)
+        self._alerts_pending = asyncio.Event()
+        self._batch_full = asyncio.Event()
+        # Monotonic arrival time of the oldest pending alert
+        self._oldest_pending_at = 0.0
+        self._consumer: Optional[asyncio.Task] = None
+        self._runner: Optional[web.AppRunner] = None
+
+        # Seconds stop() waits for the remaining alerts to be sent
+        self.drain_timeout = config.get('drain_timeout', 10)
+        self._stopping = False
 
     async def handle_alert(self, request: web.Request) -> web.Response:
         """Handle incoming alert webhook from Alertmanager.
@@ -36,18 +93,26 @@ class AlertReceiver:
             HTTP response
         """
         try:
-            data = await request.json()
+            data = orjson.loads(await request.read())
             logger.info(f"Received alert webhook: {data}")
 
             # Extract alerts from payload
             alerts = data.get('alerts', [])
 
-            for alert in alerts:
-                self.pending_alerts.append(alert)
-
-            # Start aggregation task if not running
-            if self.aggregation_task is None or self.aggregation_task.done():
-                self.aggregation_task = asyncio.create_task(self._aggregate_and_send())
+            dropped = len(self.pending_alerts) + len(alerts) - self.max_pending
+            if dropped > 0:
+                logger.warning(
+                    f"Pending alert buffer full ({self.max_pending}), dropping {dropped} oldest alert(s)"
+                )
+            if alerts and not self.pending_alerts:
+                self._oldest_pending_at = time.monotonic()
+            self.pending_alerts.extend(alerts)
+
+            # Wake up the consumer
+            if self.pending_alerts:
+                self._alerts_pending.set()
+                if len(self.pending_alerts) >= self.max_batch_size:
+                    self._batch_full.set()
 
             return web.Response(status=200, text="OK")
 
@@ -55,77 +120,107 @@ class AlertReceiver:
             logger.error(f"Failed to handle alert: {e}")
             return web.Response(status=500, text=f"Error: {str(e)}")
 
-    async def _aggregate_and_send(self):
-        """Aggregate alerts and send them after a delay."""
-        # Wait for aggregation window
-        await asyncio.sleep(30)  # 30 seconds aggregation window
-
-        if not self.pending_alerts:
-            return
+    async def _run(self):
+        """Consume pending alerts and flush them in batches.
 
-        # Group alerts by severity
-        alerts_by_severity = {
-            'critical': [],
-            'warning': [],
-            'info': []
-        }
+        A batch of at most ``max_batch_size`` alerts is sent as soon as that
+        many are pending or ``max_queue_time`` seconds after the oldest pending
+        alert arrived, also if it arrived while the previous batch was being
+        sent. A larger backlog, e.g. from a single big webhook, goes out as
+        several batches back to back.
+        """
+        while True:
+            await self._alerts_pending.wait()
+
+            remaining = self._oldest_pending_at + self.max_queue_time - time.monotonic()
+            if not self._stopping and remaining > 0:
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    pass
+
+            pending = self.pending_alerts
+            if len(pending) <= self.max_batch_size:
+                # Swap in a fresh deque before sending, so alerts that arrive
+                # while the batch is being broadcast go into the next batch
+                batch, self.pending_alerts = pending, deque(maxlen=self.max_pending)
+                self._alerts_pending.clear()
+                self._batch_full.clear()
+            else:
+                # Oldest alerts first. The rest stay timed from the oldest
+                # alert's arrival, not their own, so they may go out early
+                # but never later than max_queue_time after they arrived
+                batch = deque(pending.popleft() for _ in range(self.max_batch_size))
+                if len(pending) < self.max_batch_size:
+                    self._batch_full.clear()
+
+            if batch:
+                try:
+                    await self._aggregate_and_send(batch)
+                except Exception as e:
+                    logger.error(f"Failed to send alert batch: {e}")
+
+            if self._stopping and not self.pending_alerts:
+                return
+
+    async def _aggregate_and_send(self, batch: Deque[Dict[str, Any]]):
+        """Aggregate a batch of alerts and send them.
 
-        for alert in self.pending_alerts:
-            severity = alert.get('labels', {}).get('severity', 'info').lower()
-            if severity not in alerts_by_severity:
-                severity = 'info'
-            alerts_by_severity[severity].append(alert)
+        Args:
+            batch: Alerts collected by the consumer
+        """
+        # One timestamp per batch
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
         # Format and send message
-        message = self._format_alerts(alerts_by_severity)
+        message = self._format_alerts(batch, timestamp)
 
         # Broadcast to all users
         await self.bot.broadcast_alert(message)
 
-        # Clear pending alerts
-        self.pending_alerts.clear()
+    def _format_alerts(self, alerts: Deque[Dict[str, Any]], timestamp: str) -> str:
+        """Format alerts into a readable message, grouped by severity.
+
+        Args:
+            alerts: Alerts to include in the message
+            timestamp: Formatted time of the batch
 
-    def _format_alerts(self, alerts_by_severity: Dict[str, List[Dict]]) -> str:
-        """Format alerts into a readable message.
+        Returns:
+            Formatted message string (Telegram HTML)
+        """
+        # Group alerts by severity in a single pass
+        buckets = {severity: [] for severity, _ in SEVERITY_SECTIONS}
+        info = buckets['info']
+
+        for alert in alerts:
+            severity = (alert.get('labels') or {}).get('severity', 'info').lower()
+            buckets.get(severity, info).append(alert)
+
+        sections = [
+            self._format_section(header, buckets[severity])
+            for severity, header in SEVERITY_SECTIONS
+            if buckets[severity]
+        ]
+
+        return "\n".join([
+            "🚨 <b>Alert Notification</b>\n",
+            *sections,
+            f"📊 Total: {len(alerts)} alert(s)",
+            f"🕐 {timestamp}"
+        ])
+
+    def _format_section(self, header: str, alerts: List[Dict[str, Any]]) -> str:
+        """Format the alerts of one severity below a header line.
 
         Args:
-            alerts_by_severity: Dictionary of alerts grouped by severity
+            header: Section header
+            alerts: Alerts of this severity
 
         Returns:
-            Formatted message string
+            Formatted section string
         """
-        lines = ["🚨 *Alert Notification*\n"]
-
-        # Critical alerts
-        critical = alerts_by_severity.get('critical', [])
-        if critical:
-            lines.append("🔴 *CRITICAL ALERTS*")
-            for alert in critical:
-                lines.append(self._format_single_alert(alert))
-            lines.append("")
-
-        # Warning alerts
-        warnings = alerts_by_severity.get('warning', [])
-        if warnings:
-            lines.append("🟡 *WARNING ALERTS*")
-            for alert in warnings:
-                lines.append(self._format_single_alert(alert))
-            lines.append("")
-
-        # Info alerts
-        info = alerts_by_severity.get('info', [])
-        if info:
-            lines.append("🔵 *INFO ALERTS*")
-            for alert in info:
-                lines.append(self._format_single_alert(alert))
-            lines.append("")
-
-        # Summary
-        total = len(critical) + len(warnings) + len(info)
-        lines.append(f"📊 Total: {total} alert(s)")
-        lines.append(f"🕐 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-
-        return "\n".join(lines)
+        body = "\n".join(map(self._format_single_alert, alerts))
+        return f"{header}\n{body}\n"
 
     def _format_single_alert(self, alert: Dict[str, Any]) -> str:
         """Format a single alert.
@@ -136,41 +231,69 @@ class AlertReceiver:
         Returns:
             Formatted alert string
         """
-        labels = alert.get('labels', {})
-        annotations = alert.get('annotations', {})
-        status = alert.get('status', 'unknown')
+        labels = alert.get('labels') or {}
+        annotations = alert.get('annotations') or {}
 
         # Extract key information
         alertname = labels.get('alertname', 'Unknown')
         instance = labels.get('instance', 'unknown')
         summary = annotations.get('summary', annotations.get('description', 'No description'))
 
-        # Check if resolved
-        if status == 'resolved':
-            emoji = "🟢"
-            status_text = "RESOLVED"
-        else:
-            emoji = "🔴"
-            status_text = "FIRING"
-
-        return f"{emoji} *{alertname}* [{status_text}]\n" \
-               f"   Instance: `{instance}`\n" \
-               f"   {summary}"
+        return _format_alert_cached(alertname, instance, summary, alert.get('status'))
 
     async def start(self):
         """Start the webhook receiver."""
-        runner = web.AppRunner(self.app)
-        await runner.setup()
+        self._stopping = False
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
 
         site = web.TCPSite(
-            runner,
+            self._runner,
             host='0.0.0.0',
             port=self.config['port']
         )
 
         await site.start()
+
+        # Single long-running consumer for all incoming alerts
+        if self._consumer is None or self._consumer.done():
+            self._consumer = asyncio.create_task(self._run())
+
         logger.info(f"Alert receiver started on port {self.config['port']}")
 
+    async def stop(self):
+        """Stop the webhook receiver and its alert consumer.
+
+        Webhooks are no longer accepted, then alerts that are still pending
+        are sent right away. The consumer is cancelled if that takes longer
+        than ``drain_timeout`` seconds.
+        """
+        self._stopping = True
+
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+        if self._consumer is not None:
+            # Wake the consumer to flush without waiting for the batch to fill
+            self._alerts_pending.set()
+            self._batch_full.set()
+            await asyncio.wait((self._consumer,), timeout=self.drain_timeout)
+
+            if not self._consumer.done():
+                logger.warning(
+                    f"Alerts not sent within {self.drain_timeout}s of shutdown, "
+                    f"dropping {len(self.pending_alerts)} pending alert(s)"
+                )
+                self._consumer.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._consumer
+            self._consumer = None
+        elif self.pending_alerts:
+            logger.warning(f"Dropping {len(self.pending_alerts)} pending alert(s), receiver not running")
+
+        logger.info("Alert receiver stopped")
+
     def get_app(self):
         """Get the aiohttp application.
 
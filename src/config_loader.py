@@ -1,11 +1,24 @@
 """Configuration loader with environment variable support."""
 
 import os
+import re
 import yaml
 from pathlib import Path
 from dotenv import load_dotenv
 from typing import Any, Dict
 
+# Matches ${VAR_NAME} references anywhere inside a string value
+_ENV_VAR_PATTERN = re.compile(r"\$\{([^}]+)\}")
+
+
+def _substitute_env_var(match: re.Match) -> str:
+    """Return the value of the environment variable referenced by a match."""
+    env_var = match.group(1)
+    value = os.getenv(env_var)
+    if value is None:
+        raise ValueError(f"Environment variable {env_var} not set")
+    return value
+
 
 class ConfigLoader:
     """Loads and manages configuration from YAML and environment variables."""
@@ -22,6 +35,11 @@ class ConfigLoader:
         self.config_path = Path(config_path)
         self.config = self._load_config()
 
+        # The config is immutable after loading, so resolve dot-paths once
+        self._flat: Dict[str, Any] = {}
+        self._flatten(self.config, "")
+        self._authorized_users = frozenset(self.get('telegram.authorized_users') or [])
+
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from YAML file."""
         if not self.config_path.exists():
@@ -37,21 +55,32 @@ class ConfigLoader:
     def _resolve_env_vars(self, config: Any) -> Any:
         """Recursively resolve environment variables in config.
 
-        Environment variables are specified as ${VAR_NAME} in the YAML file.
+        Environment variables are specified as ${VAR_NAME} in the YAML file
+        and may appear several times within one value (e.g. ${HOST}:${PORT}).
         """
         if isinstance(config, dict):
             return {key: self._resolve_env_vars(value) for key, value in config.items()}
         elif isinstance(config, list):
             return [self._resolve_env_vars(item) for item in config]
-        elif isinstance(config, str) and config.startswith("${") and config.endswith("}"):
-            # Extract environment variable name
-            env_var = config[2:-1]
-            value = os.getenv(env_var)
-            if value is None:
-                raise ValueError(f"Environment variable {env_var} not set")
-            return value
+        elif isinstance(config, str):
+            return _ENV_VAR_PATTERN.sub(_substitute_env_var, config)
         return config
 
+    def _flatten(self, config: Any, prefix: str):
+        """Recursively index config values by their dot-notation key.
+
+        Args:
+            config: Configuration subtree
+            prefix: Dot-notation key of the subtree
+        """
+        if not isinstance(config, dict):
+            return
+
+        for key, value in config.items():
+            path = f"{prefix}{key}"
+            self._flat[path] = value
+            self._flatten(value, f"{path}.")
+
     def get(self, key: str, default: Any = None) -> Any:
         """Get configuration value by dot-notation key.
 
@@ -62,16 +91,7 @@ class ConfigLoader:
         Returns:
             Configuration value
         """
-        keys = key.split('.')
-        value = self.config
-
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return default
-
-        return value
+        return self._flat.get(key, default)
 
     def get_telegram_token(self) -> str:
         """Get Telegram bot token."""
@@ -80,9 +100,9 @@ class ConfigLoader:
             raise ValueError("Telegram bot token not configured")
         return token
 
-    def get_authorized_users(self) -> list:
-        """Get list of authorized Telegram user IDs."""
-        return self.get('telegram.authorized_users', [])
+    def get_authorized_users(self) -> frozenset:
+        """Get set of authorized Telegram user IDs."""
+        return self._authorized_users
 
     def get_prometheus_url(self) -> str:
         """Get Prometheus URL."""
@@ -96,5 +116,9 @@ class ConfigLoader:
         """Get Alertmanager webhook configuration."""
         return {
             'port': self.get('alertmanager.webhook_port', 9119),
-            'path': self.get('alertmanager.webhook_path', '/alerts')
+            'path': self.get('alertmanager.webhook_path', '/alerts'),
+            'max_batch_size': self.get('alerts.max_batch_size', 50),
+            'max_queue_time': self.get('alerts.aggregation_window', 10),
+            'max_pending': self.get('alerts.max_pending', 10000),
+            'drain_timeout': self.get('alerts.drain_timeout', 10)
         }
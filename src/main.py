@@ -1,7 +1,6 @@
 """Main entry point for the Telegram monitoring bot."""
 
 import sys
-import asyncio
 from pathlib import Path
 from loguru import logger
 
@@ -10,7 +9,6 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from config_loader import ConfigLoader
 from telegram_bot import MonitoringBot
-from alert_receiver import AlertReceiver
 
 
 def setup_logging(config: ConfigLoader):
@@ -44,28 +42,6 @@ def setup_logging(config: ConfigLoader):
         )
 
 
-async def start_alert_receiver(bot: MonitoringBot, config: ConfigLoader):
-    """Start the alert receiver in the background.
-
-    Args:
-        bot: MonitoringBot instance
-        config: Configuration loader instance
-    """
-    webhook_config = config.get_webhook_config()
-    receiver = AlertReceiver(bot, webhook_config)
-
-    try:
-        await receiver.start()
-        logger.info("Alert receiver running")
-
-        # Keep the receiver running
-        while True:
-            await asyncio.sleep(3600)  # Sleep for 1 hour
-
-    except Exception as e:
-        logger.error(f"Alert receiver error: {e}")
-
-
 def main():
     """Main function to start the bot."""
     try:
@@ -81,19 +57,7 @@ def main():
         # Create bot instance
         bot = MonitoringBot(config)
 
-        # Start alert receiver in the background
-        # Note: This will be integrated with the telegram bot's event loop
-        webhook_config = config.get_webhook_config()
-        receiver = AlertReceiver(bot, webhook_config)
-
-        # Create asyncio event loop
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-
-        # Start alert receiver
-        loop.create_task(receiver.start())
-
-        # Run the bot (this is blocking)
+        # Run the bot and the alert receiver on one event loop (this is blocking)
         bot.run()
 
     except KeyboardInterrupt:
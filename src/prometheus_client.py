@@ -1,10 +1,20 @@
 """Prometheus API client for querying metrics."""
 
-import requests
-from typing import Dict, List, Any, Optional
+import asyncio
+import time
+import aiohttp
+import orjson
+from typing import Dict, List, Any, Optional, Sequence, Tuple
 from datetime import datetime, timedelta
 from loguru import logger
 
+# Retries for transient connection failures, with exponential backoff
+MAX_RETRIES = 2
+RETRY_BACKOFF = 0.1
+
+# Seconds a server status result is reused for subsequent /status requests
+STATUS_CACHE_TTL = 5.0
+
 
 class PrometheusClient:
     """Client for interacting with Prometheus API."""
@@ -18,7 +28,63 @@ class PrometheusClient:
         self.base_url = prometheus_url.rstrip('/')
         self.api_url = f"{self.base_url}/api/v1"
 
-    def query(self, query: str) -> Optional[Dict[str, Any]]:
+        # Endpoint URLs are fixed, build them once
+        self._query_url = f"{self.api_url}/query"
+        self._range_url = f"{self.api_url}/query_range"
+        self._health_url = f"{self.base_url}/-/healthy"
+
+        # Created lazily, the session must be bound to the running event loop
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        # Single-flight cache of the last server status as
+        # (monotonic time, status, whether any metric could be fetched)
+        self._status_cache: Tuple[float, Optional[Dict[str, Any]], bool] = (0.0, None, False)
+        self._status_lock = asyncio.Lock()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared HTTP session, creating it on first use.
+
+        Returns:
+            aiohttp client session with a pooled keep-alive connector
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=20, keepalive_timeout=60)
+            )
+        return self._session
+
+    async def close(self):
+        """Close the underlying HTTP session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _get_json(self, url: str, params: Sequence[Tuple[str, Any]]) -> Dict[str, Any]:
+        """GET a Prometheus API endpoint, retrying transient failures.
+
+        Args:
+            url: Endpoint URL
+            params: Query parameters as (name, value) pairs
+
+        Returns:
+            Decoded JSON response
+        """
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                async with self._get_session().get(
+                    url,
+                    params=params,
+                    timeout=aiohttp.ClientTimeout(total=10)
+                ) as response:
+                    response.raise_for_status()
+                    return orjson.loads(await response.read())
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt == MAX_RETRIES:
+                    raise
+                logger.warning(f"Prometheus request failed ({e}), retrying")
+                await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+
+    async def query(self, query: str) -> Optional[Dict[str, Any]]:
         """Execute a PromQL query.
 
         Args:
@@ -28,13 +94,7 @@ class PrometheusClient:
             Query result or None if failed
         """
         try:
-            response = requests.get(
-                f"{self.api_url}/query",
-                params={'query': query},
-                timeout=10
-            )
-            response.raise_for_status()
-            data = response.json()
+            data = await self._get_json(self._query_url, (('query', query),))
 
             if data['status'] != 'success':
                 logger.error(f"Query failed: {data}")
@@ -45,7 +105,7 @@ class PrometheusClient:
             logger.error(f"Failed to query Prometheus: {e}")
             return None
 
-    def query_range(self, query: str, start: datetime, end: datetime, step: str = '15s') -> Optional[Dict[str, Any]]:
+    async def query_range(self, query: str, start: datetime, end: datetime, step: str = '15s') -> Optional[Dict[str, Any]]:
         """Execute a PromQL range query.
 
         Args:
@@ -58,18 +118,15 @@ class PrometheusClient:
             Query result or None if failed
         """
         try:
-            response = requests.get(
-                f"{self.api_url}/query_range",
-                params={
-                    'query': query,
-                    'start': start.timestamp(),
-                    'end': end.timestamp(),
-                    'step': step
-                },
-                timeout=10
+            data = await self._get_json(
+                self._range_url,
+                (
+                    ('query', query),
+                    ('start', start.timestamp()),
+                    ('end', end.timestamp()),
+                    ('step', step)
+                )
             )
-            response.raise_for_status()
-            data = response.json()
 
             if data['status'] != 'success':
                 logger.error(f"Range query failed: {data}")
@@ -80,58 +137,106 @@ class PrometheusClient:
             logger.error(f"Failed to query Prometheus range: {e}")
             return None
 
-    def get_server_status(self) -> Dict[str, Any]:
+    async def get_server_status(self) -> Dict[str, Any]:
         """Get comprehensive server status from Prometheus.
 
+        Results are cached for STATUS_CACHE_TTL seconds, and concurrent
+        callers share a single in-flight fetch. A status without any metric,
+        e.g. while Prometheus is down, is only shared with the callers that
+        waited for it, so a retry right after an outage fetches again.
+
         Returns:
             Dictionary with server metrics
         """
+        requested_at = time.monotonic()
+        cached_at, status, has_metrics = self._status_cache
+        if has_metrics and requested_at - cached_at < STATUS_CACHE_TTL:
+            return status
+
+        async with self._status_lock:
+            # Another caller may have refreshed the cache while we waited
+            cached_at, status, has_metrics = self._status_cache
+            if status is not None and (
+                cached_at >= requested_at
+                or (has_metrics and time.monotonic() - cached_at < STATUS_CACHE_TTL)
+            ):
+                return status
+
+            status = await self._fetch_server_status()
+            has_metrics = any(
+                status[key] is not None
+                for key in ('cpu_usage', 'memory_usage', 'disk_usage', 'network_traffic')
+            )
+            self._status_cache = (time.monotonic(), status, has_metrics)
+            return status
+
+    async def _fetch_server_status(self) -> Dict[str, Any]:
+        """Query Prometheus for the current server status.
+
+        One query is issued per metric category, all of them concurrently,
+        so the latency is bounded by the slowest query rather than the sum.
+
+        Returns:
+            Dictionary with server metrics
+        """
+        cpu, memory, disk, network = await asyncio.gather(
+            self._get_cpu_usage(),
+            self._get_memory_usage(),
+            self._get_disk_usage(),
+            self._get_network_traffic()
+        )
         status = {
-            'cpu_usage': self._get_cpu_usage(),
-            'memory_usage': self._get_memory_usage(),
-            'disk_usage': self._get_disk_usage(),
-            'network_traffic': self._get_network_traffic(),
+            'cpu_usage': cpu,
+            'memory_usage': memory,
+            'disk_usage': disk,
+            'network_traffic': network,
             'timestamp': datetime.now().isoformat()
         }
         return status
 
-    def _get_cpu_usage(self) -> Optional[float]:
+    async def _get_cpu_usage(self) -> Optional[float]:
         """Get CPU usage percentage."""
         query = '100 - (avg by (instance) (irate(node_cpu_seconds_total{mode="idle"}[5m])) * 100)'
-        result = self.query(query)
+        result = await self.query(query)
 
         if result and result['result']:
             return round(float(result['result'][0]['value'][1]), 2)
         return None
 
-    def _get_memory_usage(self) -> Optional[Dict[str, float]]:
+    async def _get_memory_usage(self) -> Optional[Dict[str, float]]:
         """Get memory usage statistics."""
-        # Total memory
-        total_query = 'node_memory_MemTotal_bytes'
-        total_result = self.query(total_query)
-
-        # Available memory
-        available_query = 'node_memory_MemAvailable_bytes'
-        available_result = self.query(available_query)
-
-        if total_result and total_result['result'] and available_result and available_result['result']:
-            total = float(total_result['result'][0]['value'][1])
-            available = float(available_result['result'][0]['value'][1])
-            used = total - available
-            usage_percent = (used / total) * 100
-
-            return {
-                'total_gb': round(total / (1024**3), 2),
-                'used_gb': round(used / (1024**3), 2),
-                'available_gb': round(available / (1024**3), 2),
-                'usage_percent': round(usage_percent, 2)
-            }
+        # Total and available memory in a single query, told apart by __name__.
+        # A name matcher rather than `or`, which matches on labels only and
+        # would drop every MemAvailable series sharing a MemTotal series' labels
+        query = '{__name__=~"node_memory_MemTotal_bytes|node_memory_MemAvailable_bytes"}'
+        result = await self.query(query)
+
+        if result and result['result']:
+            by_instance: Dict[str, Dict[str, float]] = {}
+            for item in result['result']:
+                metric = item['metric']
+                values = by_instance.setdefault(metric.get('instance', ''), {})
+                values[metric.get('__name__')] = float(item['value'][1])
+
+            for values in by_instance.values():
+                if 'node_memory_MemTotal_bytes' in values and 'node_memory_MemAvailable_bytes' in values:
+                    total = values['node_memory_MemTotal_bytes']
+                    available = values['node_memory_MemAvailable_bytes']
+                    used = total - available
+                    usage_percent = (used / total) * 100
+
+                    return {
+                        'total_gb': round(total / (1024**3), 2),
+                        'used_gb': round(used / (1024**3), 2),
+                        'available_gb': round(available / (1024**3), 2),
+                        'usage_percent': round(usage_percent, 2)
+                    }
         return None
 
-    def _get_disk_usage(self) -> Optional[List[Dict[str, Any]]]:
+    async def _get_disk_usage(self) -> Optional[List[Dict[str, Any]]]:
         """Get disk usage for all mounted filesystems."""
         query = '(node_filesystem_size_bytes{fstype!~"tmpfs|fuse.lxcfs|squashfs|vfat"} - node_filesystem_free_bytes{fstype!~"tmpfs|fuse.lxcfs|squashfs|vfat"}) / node_filesystem_size_bytes{fstype!~"tmpfs|fuse.lxcfs|squashfs|vfat"} * 100'
-        result = self.query(query)
+        result = await self.query(query)
 
         if result and result['result']:
             disks = []
@@ -146,35 +251,42 @@ class PrometheusClient:
             return disks
         return None
 
-    def _get_network_traffic(self) -> Optional[Dict[str, float]]:
+    async def _get_network_traffic(self) -> Optional[Dict[str, float]]:
         """Get network traffic statistics."""
-        # Received bytes rate
-        rx_query = 'rate(node_network_receive_bytes_total{device!~"lo|docker.*|veth.*"}[5m])'
-        rx_result = self.query(rx_query)
+        # Received and transmitted bytes rate, labelled by direction
+        query = (
+            'label_replace(sum(rate(node_network_receive_bytes_total{device!~"lo|docker.*|veth.*"}[5m])), '
+            '"direction", "rx", "", "") or '
+            'label_replace(sum(rate(node_network_transmit_bytes_total{device!~"lo|docker.*|veth.*"}[5m])), '
+            '"direction", "tx", "", "")'
+        )
+        result = await self.query(query)
 
-        # Transmitted bytes rate
-        tx_query = 'rate(node_network_transmit_bytes_total{device!~"lo|docker.*|veth.*"}[5m])'
-        tx_result = self.query(tx_query)
-
-        if rx_result and rx_result['result'] and tx_result and tx_result['result']:
-            rx_total = sum(float(item['value'][1]) for item in rx_result['result'])
-            tx_total = sum(float(item['value'][1]) for item in tx_result['result'])
-
-            return {
-                'rx_mbps': round(rx_total * 8 / (1024**2), 2),  # Convert to Mbps
-                'tx_mbps': round(tx_total * 8 / (1024**2), 2)
+        if result and result['result']:
+            totals = {
+                item['metric'].get('direction'): float(item['value'][1])
+                for item in result['result']
             }
+
+            if 'rx' in totals and 'tx' in totals:
+                return {
+                    'rx_mbps': round(totals['rx'] * 8 / (1024**2), 2),  # Convert to Mbps
+                    'tx_mbps': round(totals['tx'] * 8 / (1024**2), 2)
+                }
         return None
 
-    def check_health(self) -> bool:
+    async def check_health(self) -> bool:
         """Check if Prometheus server is healthy.
 
         Returns:
             True if healthy, False otherwise
         """
         try:
-            response = requests.get(f"{self.base_url}/-/healthy", timeout=5)
-            return response.status_code == 200
+            async with self._get_session().get(
+                self._health_url,
+                timeout=aiohttp.ClientTimeout(total=5)
+            ) as response:
+                return response.status == 200
         except Exception as e:
             logger.error(f"Prometheus health check failed: {e}")
             return False
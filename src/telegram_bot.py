@@ -2,6 +2,7 @@
 
 from telegram import Update
 from telegram.ext import (
+    AIORateLimiter,
     Application,
     CommandHandler,
     ContextTypes,
@@ -9,12 +10,157 @@ from telegram.ext import (
     filters
 )
 from loguru import logger
-from typing import Optional
+from typing import List, Tuple, Union
 import asyncio
+import re
 
 from config_loader import ConfigLoader
 from user_manager import UserManager
 from prometheus_client import PrometheusClient
+from alert_receiver import AlertReceiver
+
+# Telegram rejects messages above 4096 characters, keep some headroom
+MESSAGE_CHUNK_LIMIT = 4000
+
+# Telegram allows about 30 messages per second overall
+MAX_MESSAGES_PER_SECOND = 30
+
+# Seconds between two chunks sent to the same user. Telegram allows about one
+# message per second per chat, and AIORateLimiter only paces group chats
+PER_CHAT_INTERVAL = 1.0
+
+# Retries of a send after Telegram answered with RetryAfter (HTTP 429)
+SEND_MAX_RETRIES = 3
+
+# Sends of a broadcast in flight at once; the rate limiter paces them
+MAX_CONCURRENT_SENDS = 25
+
+# Tags and entities of Telegram HTML, a chunk is never cut inside one
+_HTML_TOKEN = re.compile(r'<(/?)([a-zA-Z][a-zA-Z0-9-]*)[^>]*>|&#?\w{1,10};')
+
+
+def _split_long_line(line: str, limit: int) -> List[str]:
+    """Cut a line longer than the limit into chunks of valid HTML.
+
+    Cuts are made only in plain text, never inside a tag or an entity. Tags
+    still open at a cut are closed at the end of the chunk and reopened at
+    the start of the next one.
+
+    Args:
+        line: Line to cut
+        limit: Maximum chunk length
+
+    Returns:
+        List of line chunks
+    """
+    chunks = []
+    parts: List[str] = []
+    length = 0
+    # (tag name, opening tag) of the elements open at the current position
+    open_tags: List[Tuple[str, str]] = []
+
+    def reserved() -> int:
+        # Room needed to close the open elements at a cut
+        return sum(len(name) + 3 for name, _ in open_tags)
+
+    def cut():
+        nonlocal parts, length
+        closing = "".join(f"</{name}>" for name, _ in reversed(open_tags))
+        chunks.append("".join(parts) + closing)
+        parts = [tag for _, tag in open_tags]
+        length = sum(map(len, parts))
+
+    def has_content() -> bool:
+        # Anything beyond the reopened tags at the start of the chunk
+        return len(parts) > len(open_tags)
+
+    def add(token: str, extra: int = 0):
+        nonlocal length
+        if length + len(token) + reserved() + extra > limit and has_content():
+            cut()
+        parts.append(token)
+        length += len(token)
+
+    def add_text(text: str):
+        # Plain text may be cut anywhere
+        while text:
+            room = limit - length - reserved()
+            if room <= 0 and has_content():
+                cut()
+                continue
+            # Always make progress, even if reopened tags fill the chunk
+            room = max(room, 1)
+            add(text[:room])
+            text = text[room:]
+
+    pos = 0
+    for match in _HTML_TOKEN.finditer(line):
+        add_text(line[pos:match.start()])
+        pos = match.end()
+
+        token = match.group(0)
+        is_closing, name = match.group(1), match.group(2)
+        if not name:
+            add(token)
+        elif not is_closing:
+            # The element must also be closed in this chunk
+            add(token, len(name) + 3)
+            open_tags.append((name, token))
+        elif open_tags and open_tags[-1][0] == name:
+            # Replaces the room reserved for closing the element
+            add(token, -len(token))
+            open_tags.pop()
+        else:
+            add(token)
+    add_text(line[pos:])
+
+    if has_content():
+        cut()
+    return chunks
+
+
+def _split_message(message: str, limit: int = MESSAGE_CHUNK_LIMIT) -> List[str]:
+    """Split a message into chunks Telegram accepts.
+
+    Chunks are cut at line boundaries so HTML tags, which never span lines in
+    our messages, stay balanced. Only a single line longer than the limit is
+    cut mid-line, see _split_long_line().
+
+    Args:
+        message: Message to split
+        limit: Maximum chunk length
+
+    Returns:
+        List of message chunks
+    """
+    if len(message) <= limit:
+        return [message]
+
+    chunks = []
+    current = []
+    current_len = 0
+
+    for line in message.split("\n"):
+        if len(line) > limit:
+            if current:
+                chunks.append("\n".join(current))
+                current, current_len = [], 0
+            *pieces, line = _split_long_line(line, limit)
+            chunks.extend(pieces)
+
+        # +1 for the newline joining this line to the previous one
+        if current and current_len + 1 + len(line) > limit:
+            chunks.append("\n".join(current))
+            current, current_len = [], 0
+
+        current_len += len(line) + (1 if current else 0)
+        current.append(line)
+
+    if current:
+        chunks.append("\n".join(current))
+
+    # Telegram rejects empty messages
+    return [chunk for chunk in chunks if chunk.strip()]
 
 
 class MonitoringBot:
@@ -29,9 +175,27 @@ class MonitoringBot:
         self.config = config
         self.user_manager = UserManager(config.get_authorized_users())
         self.prometheus = PrometheusClient(config.get_prometheus_url())
-
-        # Create application
-        self.application = Application.builder().token(config.get_telegram_token()).build()
+        self.alert_receiver = AlertReceiver(self, config.get_webhook_config())
+
+        # Bound the sends of a broadcast in flight at once. This does not
+        # limit the send rate, that is the job of the application's rate limiter
+        self._send_sem = asyncio.Semaphore(MAX_CONCURRENT_SENDS)
+
+        # Create application. The rate limiter keeps all requests below the
+        # overall flood limit and retries them on RetryAfter; chunks to one
+        # user are paced in send_alert()
+        self.application = (
+            Application.builder()
+            .token(config.get_telegram_token())
+            .rate_limiter(AIORateLimiter(
+                overall_max_rate=MAX_MESSAGES_PER_SECOND,
+                max_retries=SEND_MAX_RETRIES
+            ))
+            .post_init(self._post_init)
+            .post_stop(self._post_stop)
+            .post_shutdown(self._post_shutdown)
+            .build()
+        )
 
         # Register command handlers
         self._register_handlers()
@@ -49,6 +213,20 @@ class MonitoringBot:
         # Handle unknown commands
         self.application.add_handler(MessageHandler(filters.COMMAND, self.cmd_unknown))
 
+    async def _post_init(self, application: Application):
+        """Start the alert receiver on the application's event loop."""
+        await self.alert_receiver.start()
+
+    async def _post_stop(self, application: Application):
+        """Stop the alert receiver while the bot can still send its last alerts."""
+        await self.alert_receiver.stop()
+
+    async def _post_shutdown(self, application: Application):
+        """Release resources once the application has shut down."""
+        await self.prometheus.close()
+        await self.user_manager.drain()
+        self.user_manager.close()
+
     def _check_authorization(self, user_id: int) -> bool:
         """Check if user is authorized.
 
@@ -114,7 +292,7 @@ class MonitoringBot:
 
         try:
             # Get status from Prometheus
-            status = self.prometheus.get_server_status()
+            status = await self.prometheus.get_server_status()
 
             # Format status message
             status_text = self._format_status(status)
@@ -213,7 +391,7 @@ class MonitoringBot:
 
         msg = await update.message.reply_text("Checking Prometheus health...")
 
-        is_healthy = self.prometheus.check_health()
+        is_healthy = await self.prometheus.check_health()
 
         if is_healthy:
             await msg.edit_text("✅ Prometheus is healthy and reachable!")
@@ -234,19 +412,25 @@ class MonitoringBot:
             "❓ Unknown command. Use /help to see available commands."
         )
 
-    async def send_alert(self, user_id: int, message: str):
+    async def send_alert(self, user_id: int, message: Union[str, List[str]]):
         """Send alert message to a user.
 
         Args:
             user_id: Telegram user ID
-            message: Alert message
+            message: Alert message formatted as Telegram HTML, or its
+                pre-split chunks
         """
+        chunks = _split_message(message) if isinstance(message, str) else message
+
         try:
-            await self.application.bot.send_message(
-                chat_id=user_id,
-                text=message,
-                parse_mode='Markdown'
-            )
+            for i, chunk in enumerate(chunks):
+                if i:
+                    await asyncio.sleep(PER_CHAT_INTERVAL)
+                await self.application.bot.send_message(
+                    chat_id=user_id,
+                    text=chunk,
+                    parse_mode='HTML'
+                )
             logger.info(f"Alert sent to user {user_id}")
         except Exception as e:
             logger.error(f"Failed to send alert to user {user_id}: {e}")
@@ -260,10 +444,25 @@ class MonitoringBot:
         users = self.user_manager.get_all_users()
         logger.info(f"Broadcasting alert to {len(users)} users")
 
-        for user_id in users:
-            await self.send_alert(user_id, message)
+        # Split once and reuse the chunks for every user
+        chunks = _split_message(message)
+
+        await asyncio.gather(
+            *(self._send_alert_limited(user_id, chunks) for user_id in users),
+            return_exceptions=True
+        )
+
+    async def _send_alert_limited(self, user_id: int, chunks: List[str]):
+        """Send alert chunks to a user while holding the send semaphore.
+
+        Args:
+            user_id: Telegram user ID
+            chunks: Alert message chunks
+        """
+        async with self._send_sem:
+            await self.send_alert(user_id, chunks)
 
     def run(self):
-        """Start the bot."""
+        """Start the bot and the alert receiver (blocking)."""
         logger.info("Starting Telegram bot...")
         self.application.run_polling(allowed_updates=Update.ALL_TYPES)
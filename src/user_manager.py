@@ -1,60 +1,426 @@
 """User authorization and management."""
 
-import json
+import asyncio
+import atexit
+import os
+import sys
+import threading
+import time
+from array import array
+from contextlib import contextmanager, suppress
+from itertools import chain
 from pathlib import Path
-from typing import Set
+from typing import Callable, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+import orjson
 from loguru import logger
 
+# Minimum seconds between two writes of the storage file
+FLUSH_INTERVAL = 5.0
+
+# Fold the log into a new snapshot once it holds this many records per user
+COMPACT_RATIO = 2
+
+# Snapshot files hold little-endian int64 user IDs
+_SNAPSHOT_TYPECODE = 'q'
+_SWAP_BYTES = sys.byteorder != 'little'
+
+
+def _write_all(fd: int, data):
+    """Write all of data to a file descriptor, retrying on short writes.
+
+    Args:
+        fd: Open file descriptor
+        data: Bytes-like object to write
+    """
+    # Byte-wise view: slicing a view of an array('q') would skip 8-byte items
+    view = memoryview(data).cast('B')
+    while view:
+        view = view[os.write(fd, view):]
+
 
 class UserManager:
-    """Manages authorized users for the Telegram bot."""
+    """Manages authorized users for the Telegram bot.
+
+    Users are persisted as a binary snapshot of packed int64 IDs (``.bin``
+    next to the storage path) plus an append-only JSON Lines log of
+    ``{"op": "add" | "del", "id": <user_id>}`` records made since. The log is
+    replayed on top of the snapshot on load and periodically folded into a
+    new snapshot.
+    """
+
+    # Fixed attribute layout: no per-instance __dict__, attribute reads are
+    # slot offsets instead of dict lookups
+    __slots__ = (
+        'storage_path', 'snapshot_path', 'is_authorized',
+        '_snapshot', '_users_tuple', '_loading',
+        '_flush_interval', '_last_flush', '_batch_depth', '_save_task',
+        '_pending_ops', '_log_records', '_compact_next', '_last_saved_users',
+        '_keep_open', '_log_fd', '_buffer', '_state_lock', '_write_lock',
+    )
 
-    def __init__(self, authorized_users: list, storage_path: str = "data/authorized_users.json"):
+    # Storage directories already created by this process
+    _ensured_dirs = set()
+
+    # is_authorized(user_id) -> bool: check if a user is authorized.
+    # Bound to the current set's __contains__ whenever the set is replaced, so
+    # the per-message check is a single C call without a Python frame
+    is_authorized: Callable[[int], bool]
+
+    def __init__(self, authorized_users: Iterable[int], storage_path: str = "data/authorized_users.jsonl",
+                 flush_interval: float = FLUSH_INTERVAL, keep_open: bool = True):
         """Initialize user manager.
 
         Args:
-            authorized_users: Initial list of authorized user IDs
+            authorized_users: Initial authorized user IDs, e.g. from the config
             storage_path: Path to store authorized users
+            flush_interval: Minimum seconds between two writes of the storage file
+            keep_open: Keep the log open between appends instead of reopening it per write
         """
         self.storage_path = Path(storage_path)
-        self.authorized_users: Set[int] = set(authorized_users)
+        self.snapshot_path = self.storage_path.with_suffix('.bin')
+
+        # Construction only reads storage, see _save_users()
+        self._loading = True
+
+        # Changes are written back lazily, see flush() and schedule_save()
+        self._flush_interval = flush_interval
+        self._last_flush = float('-inf')
+        self._batch_depth = 0
+        self._pending_ops: List[Tuple[str, int]] = []
+        self._log_records = 0
+        self._compact_next = False
+        self._save_task: Optional[asyncio.Task] = None
+
+        # Append handle of the log, opened on the first append, see _append()
+        self._keep_open = keep_open
+        self._log_fd: Optional[int] = None
+
+        # Saves may run in a worker thread: _state_lock pairs the user set with
+        # its pending log records, _write_lock serializes writes to the log
+        self._state_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+        # Users as of the last write, to skip saves that would change nothing
+        self._last_saved_users: Optional[FrozenSet[int]] = None
+
+        # Reused across saves to encode the payload without reallocating
+        self._buffer = bytearray()
 
         # Create data directory if it doesn't exist
-        self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+        data_dir = self.storage_path.parent
+        if data_dir not in UserManager._ensured_dirs:
+            data_dir.mkdir(parents=True, exist_ok=True)
+            UserManager._ensured_dirs.add(data_dir)
+
+        # Load additional users from storage and build the set in one pass.
+        # It is the only copy of the users: an immutable set that is replaced
+        # on every change, so reads are lock-free and need no second hash table
+        stored_users = self._load_users()
+        self._snapshot: FrozenSet[int] = frozenset(chain(authorized_users, stored_users))
+        self.is_authorized = self._snapshot.__contains__
+
+        # Sorted users as (user set, tuple), rebuilt whenever the set is replaced
+        self._users_tuple: Optional[Tuple[FrozenSet[int], Tuple[int, ...]]] = None
+
+        # Never lose pending changes on interpreter exit
+        atexit.register(self.close)
+        self._loading = False
+
+    def _load_users(self) -> set:
+        """Load authorized users from storage.
+
+        Returns:
+            Set of stored user IDs, empty if there is no storage yet
+        """
+        stored_users = set()
+        legacy_path = self.storage_path.with_suffix('.json')
 
-        # Load additional users from storage
-        self._load_users()
+        try:
+            if self.snapshot_path.exists():
+                ids = array(_SNAPSHOT_TYPECODE)
+                ids.frombytes(self.snapshot_path.read_bytes())
+                if _SWAP_BYTES:
+                    ids.byteswap()
+                stored_users.update(ids)
+
+            if self.storage_path.exists():
+                # Read the whole log in one go, it is small and read only at startup.
+                # Replaying it is idempotent, so a log left behind by a crash
+                # right after writing its snapshot yields the same users
+                for line in self.storage_path.read_bytes().splitlines():
+                    if not line.strip():
+                        continue
+                    try:
+                        record = orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        # A crash mid-append can leave a torn last record,
+                        # rewrite the log before appending to it again
+                        logger.warning(f"Skipping corrupt record in {self.storage_path}")
+                        self._compact_next = True
+                        continue
+                    if record['op'] == 'add':
+                        stored_users.add(record['id'])
+                    else:
+                        stored_users.discard(record['id'])
+                    self._log_records += 1
+
+            if self.snapshot_path.exists() or self.storage_path.exists():
+                self._last_saved_users = frozenset(stored_users)
+            elif legacy_path.exists():
+                # Migrate the former JSON list format, the next write creates a snapshot
+                stored_users.update(orjson.loads(legacy_path.read_bytes()))
+                self._compact_next = True
+                logger.info(f"Migrating users from {legacy_path}")
+            else:
+                return stored_users
+
+            logger.info(f"Loaded {len(stored_users)} users from storage")
+            return stored_users
+        except Exception as e:
+            logger.error(f"Failed to load users from storage: {e}")
+            return set()
+
+    def _save_users(self) -> bool:
+        """Save authorized users to storage.
+
+        Pending changes are appended to the log. A new snapshot is written and
+        the log emptied instead when there is no snapshot yet, the log contains
+        a corrupt record or has grown past COMPACT_RATIO records per user.
+        Safe to call from a worker thread.
+
+        Returns:
+            True if storage is up to date with the users, including when the
+            pending changes cancelled out and nothing had to be written;
+            False if nothing may be written yet or writing failed
+        """
+        if self._loading:
+            # Storage was just read, writing it back would change nothing
+            return False
+
+        with self._write_lock:
+            with self._state_lock:
+                users = self._snapshot
+                pending, self._pending_ops = self._pending_ops, []
+
+            if users == self._last_saved_users and not self._compact_next:
+                # Pending changes cancel out, e.g. a user added and removed again
+                return True
+
+            compact = (
+                self._compact_next
+                or not self.snapshot_path.exists()
+                or self._log_records + len(pending) > COMPACT_RATIO * len(users)
+            )
 
-    def _load_users(self):
-        """Load authorized users from storage."""
-        if self.storage_path.exists():
             try:
-                with open(self.storage_path, 'r') as f:
-                    stored_users = json.load(f)
-                    self.authorized_users.update(stored_users)
-                logger.info(f"Loaded {len(stored_users)} users from storage")
+                if compact:
+                    # Packed IDs need no per-element encoding. Sorted so
+                    # snapshots of the same users are byte-identical
+                    ids = array(_SNAPSHOT_TYPECODE, self._sorted_users(users))
+                    if _SWAP_BYTES:
+                        ids.byteswap()
+                    self._write_atomic(self.snapshot_path, ids)
+                    self._truncate_log()
+                else:
+                    # Encode straight to bytes and write with a single call
+                    buffer = self._buffer
+                    buffer.clear()
+                    for op, user_id in pending:
+                        buffer += orjson.dumps({"op": op, "id": user_id})
+                        buffer += b"\n"
+                    self._append(buffer)
             except Exception as e:
-                logger.error(f"Failed to load users from storage: {e}")
+                logger.error(f"Failed to save users to storage: {e}")
+                # Keep the changes for the next attempt
+                with self._state_lock:
+                    self._pending_ops[:0] = pending
+                return False
+
+            self._log_records = 0 if compact else self._log_records + len(pending)
+            self._compact_next = False
+            self._last_saved_users = users
+            logger.info("Saved {} users to storage", len(users))
+            return True
+
+    async def _save_users_async(self):
+        """Write pending changes from a worker thread, debounced by flush_interval."""
+        while self._dirty:
+            delay = self._last_flush + self._flush_interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            self._last_flush = time.monotonic()
+            if not await asyncio.to_thread(self._save_users):
+                break
+
+    @staticmethod
+    def _write_atomic(path: Path, data: array):
+        """Replace a file with new contents.
 
-    def _save_users(self):
-        """Save authorized users to storage."""
+        The data is written to a temporary file that is then renamed over the
+        target, so a crash never leaves a truncated file behind.
+
+        Args:
+            path: File to replace
+            data: New file contents
+        """
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
         try:
-            with open(self.storage_path, 'w') as f:
-                json.dump(list(self.authorized_users), f, indent=2)
-            logger.info(f"Saved {len(self.authorized_users)} users to storage")
-        except Exception as e:
-            logger.error(f"Failed to save users to storage: {e}")
+            _write_all(fd, data)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+
+    def _truncate_log(self):
+        """Empty the log once its records are part of the snapshot."""
+        if self._log_fd is not None:
+            os.ftruncate(self._log_fd, 0)
+        elif self.storage_path.exists():
+            os.truncate(self.storage_path, 0)
+
+    def _append(self, data: bytearray):
+        """Append records to the log.
 
-    def is_authorized(self, user_id: int) -> bool:
-        """Check if user is authorized.
+        The log is opened once with O_APPEND and kept open, so an append is a
+        single write syscall without an open/close pair around it.
 
         Args:
+            data: Encoded log records
+        """
+        if self._log_fd is None:
+            self._log_fd = os.open(self.storage_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            _write_all(self._log_fd, data)
+        finally:
+            if not self._keep_open:
+                self._close_log()
+
+    def _close_log(self):
+        """Close the append handle of the log if it is open."""
+        if self._log_fd is not None:
+            os.close(self._log_fd)
+            self._log_fd = None
+
+    @property
+    def _dirty(self) -> bool:
+        """Whether storage is behind the in-memory users."""
+        return bool(self._pending_ops) or self._compact_next
+
+    def _record_change(self, op: str, user_id: int, users: FrozenSet[int]):
+        """Publish a new user set and write the change back unless a batch is open.
+
+        Args:
+            op: Log operation, "add" or "del"
             user_id: Telegram user ID
+            users: User set after the change
+        """
+        with self._state_lock:
+            self._snapshot = users
+            self.is_authorized = users.__contains__
+            self._pending_ops.append((op, user_id))
+
+        if not self._batch_depth:
+            self._request_save()
+
+    def _request_save(self, force: bool = False):
+        """Write back pending changes in the background or, outside an event loop, now.
+
+        Args:
+            force: Write regardless of the flush interval (synchronous path only)
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush(force=force)
+        else:
+            self.schedule_save()
+
+    def schedule_save(self):
+        """Schedule a background write on the running event loop.
+
+        Concurrent requests are coalesced into the already scheduled write,
+        so a burst of changes still results in a single write.
+        """
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.get_running_loop().create_task(self._save_users_async())
+
+    def flush(self, force: bool = False) -> bool:
+        """Write pending changes to storage.
+
+        Without ``force`` the write is skipped if the last one happened less
+        than ``flush_interval`` seconds ago; the change is then picked up by a
+        later flush or at exit.
+
+        Args:
+            force: Write regardless of the flush interval
 
         Returns:
-            True if user is authorized, False otherwise
+            True if the pending changes were saved, or cancelled out so that
+            storage was already up to date without a write; False if nothing
+            was pending, the write was deferred or it failed
         """
-        return user_id in self.authorized_users
+        if not self._dirty:
+            return False
+
+        now = time.monotonic()
+        if not force and now - self._last_flush < self._flush_interval:
+            return False
+
+        if not self._save_users():
+            return False
+
+        self._last_flush = now
+        return True
+
+    async def drain(self):
+        """Cancel any scheduled background write and write everything now."""
+        if self._save_task is not None:
+            self._save_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._save_task
+            self._save_task = None
+
+        self.flush(force=True)
+
+    def export_json(self, path: str):
+        """Export the authorized users as a JSON list, e.g. for debugging.
+
+        Args:
+            path: Path of the JSON file to write
+        """
+        Path(path).write_bytes(orjson.dumps(list(self._sorted_users()), option=orjson.OPT_INDENT_2))
+
+    def close(self):
+        """Write pending changes and close the log file."""
+        # Closed explicitly, the exit hook no longer needs to keep us alive
+        atexit.unregister(self.close)
+        self.flush(force=True)
+        with self._write_lock:
+            self._close_log()
+
+    @contextmanager
+    def batched(self) -> Iterator["UserManager"]:
+        """Group several changes into a single write.
+
+        Example:
+            with user_manager.batched():
+                for user_id in user_ids:
+                    user_manager.add_user(user_id)
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self._request_save(force=True)
+
+    @property
+    def authorized_users(self) -> FrozenSet[int]:
+        """Current set of authorized user IDs (read-only)."""
+        return self._snapshot
 
     def add_user(self, user_id: int) -> bool:
         """Add user to authorized list.
@@ -65,12 +431,11 @@ class UserManager:
         Returns:
             True if user was added, False if already exists
         """
-        if user_id in self.authorized_users:
+        if user_id in self._snapshot:
             return False
 
-        self.authorized_users.add(user_id)
-        self._save_users()
-        logger.info(f"Added user {user_id} to authorized list")
+        self._record_change('add', user_id, self._snapshot | {user_id})
+        logger.debug("Added user {} to authorized list", user_id)
         return True
 
     def remove_user(self, user_id: int) -> bool:
@@ -82,12 +447,11 @@ class UserManager:
         Returns:
             True if user was removed, False if not found
         """
-        if user_id not in self.authorized_users:
+        if user_id not in self._snapshot:
             return False
 
-        self.authorized_users.remove(user_id)
-        self._save_users()
-        logger.info(f"Removed user {user_id} from authorized list")
+        self._record_change('del', user_id, self._snapshot - {user_id})
+        logger.debug("Removed user {} from authorized list", user_id)
         return True
 
     def get_all_users(self) -> list:
@@ -96,4 +460,24 @@ class UserManager:
         Returns:
             List of authorized user IDs
         """
-        return list(self.authorized_users)
+        return list(self._sorted_users())
+
+    def _sorted_users(self, users: Optional[FrozenSet[int]] = None) -> Tuple[int, ...]:
+        """Get authorized users in ascending order.
+
+        Args:
+            users: User set to sort, defaults to the current users
+
+        Returns:
+            Cached tuple of authorized user IDs
+        """
+        if users is None:
+            users = self._snapshot
+
+        # Keyed on the set's identity, so a cache entry built from an older set
+        # (e.g. by a save running in a worker thread) is never returned
+        cached = self._users_tuple
+        if cached is None or cached[0] is not users:
+            cached = (users, tuple(sorted(users)))
+            self._users_tuple = cached
+        return cached[1]
@@ -0,0 +1,179 @@
+"""Tests for alert_receiver module."""
+
+import asyncio
+import json
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from alert_receiver import AlertReceiver, _format_alert_cached
+
+
+class _FakeBot:
+    """Records broadcast messages instead of sending them."""
+
+    def __init__(self):
+        self.messages = []
+
+    async def broadcast_alert(self, message: str):
+        self.messages.append(message)
+
+
+class _FakeRequest:
+    """Minimal stand-in for an aiohttp request carrying a webhook payload."""
+
+    def __init__(self, alerts):
+        self._body = json.dumps({'alerts': alerts}).encode()
+
+    async def read(self) -> bytes:
+        return self._body
+
+
+def _alerts(count: int) -> list:
+    """Build firing alerts with distinct names."""
+    return [
+        {'status': 'firing', 'labels': {'alertname': f'Alert{i}', 'severity': 'warning'}}
+        for i in range(count)
+    ]
+
+
+def _receiver(**config) -> AlertReceiver:
+    return AlertReceiver(_FakeBot(), {'path': '/alerts', 'port': 0, **config})
+
+
+def test_stop_flushes_pending_alerts():
+    """Test that alerts still pending at shutdown are sent, not dropped."""
+    receiver = _receiver(max_batch_size=50, max_queue_time=60)
+
+    async def run():
+        receiver._consumer = asyncio.create_task(receiver._run())
+        await receiver.handle_alert(_FakeRequest(_alerts(3)))
+        await asyncio.sleep(0)
+        await receiver.stop()
+
+    asyncio.run(run())
+
+    assert len(receiver.bot.messages) == 1
+    assert "Total: 3 alert(s)" in receiver.bot.messages[0]
+    assert receiver._consumer is None
+
+
+def test_stop_cancels_stuck_consumer():
+    """Test that stop() gives up on a broadcast that outlives drain_timeout."""
+    receiver = _receiver(max_batch_size=1, max_queue_time=60, drain_timeout=0.05)
+
+    async def hang(message):
+        await asyncio.sleep(60)
+
+    receiver.bot.broadcast_alert = hang
+
+    async def run():
+        receiver._consumer = consumer = asyncio.create_task(receiver._run())
+        await receiver.handle_alert(_FakeRequest(_alerts(1)))
+        await asyncio.sleep(0)
+        await asyncio.wait_for(receiver.stop(), timeout=1)
+        return consumer
+
+    consumer = asyncio.run(run())
+
+    assert consumer.cancelled()
+
+
+def _totals(messages) -> list:
+    """Extract the alert count of each sent batch."""
+    return [int(message.split("Total: ")[1].split(" ")[0]) for message in messages]
+
+
+def test_batch_sent_when_full():
+    """Test that a full batch is sent without waiting for max_queue_time."""
+    receiver = _receiver(max_batch_size=2, max_queue_time=60)
+
+    async def run():
+        receiver._consumer = asyncio.create_task(receiver._run())
+        for _ in range(5):
+            await receiver.handle_alert(_FakeRequest(_alerts(1)))
+        await asyncio.sleep(0.1)
+        sent = list(receiver.bot.messages)
+        receiver._consumer.cancel()
+        return sent
+
+    sent = asyncio.run(run())
+
+    # The fifth alert waits for the batch to fill up or to time out
+    assert _totals(sent) == [2, 2]
+
+
+def test_large_webhook_is_split_into_batches():
+    """Test that one webhook with more alerts than max_batch_size is split."""
+    receiver = _receiver(max_batch_size=2, max_queue_time=0.05)
+
+    async def run():
+        receiver._consumer = asyncio.create_task(receiver._run())
+        await receiver.handle_alert(_FakeRequest(_alerts(5)))
+        await asyncio.sleep(0.3)
+        receiver._consumer.cancel()
+
+    asyncio.run(run())
+
+    assert _totals(receiver.bot.messages) == [2, 2, 1]
+
+
+def test_batch_sent_after_max_queue_time():
+    """Test that a batch is sent max_queue_time after its oldest alert arrived."""
+    receiver = _receiver(max_batch_size=50, max_queue_time=0.2)
+    broadcast = receiver.bot.broadcast_alert
+
+    async def slow_broadcast(message):
+        await broadcast(message)
+        await asyncio.sleep(0.4)
+
+    receiver.bot.broadcast_alert = slow_broadcast
+
+    async def run():
+        receiver._consumer = asyncio.create_task(receiver._run())
+        await receiver.handle_alert(_FakeRequest(_alerts(1)))
+        assert not receiver.bot.messages
+
+        # Arrives while the first batch is being sent, has waited long
+        # enough once that is done and must not wait another max_queue_time
+        await asyncio.sleep(0.3)
+        assert _totals(receiver.bot.messages) == [1]
+        await receiver.handle_alert(_FakeRequest(_alerts(1)))
+
+        # The first broadcast is done after 0.6s, the second alert was due at 0.5s
+        await asyncio.sleep(0.4)
+        sent = list(receiver.bot.messages)
+        receiver._consumer.cancel()
+        return sent
+
+    sent = asyncio.run(run())
+
+    assert _totals(sent) == [1, 1]
+
+
+def test_alert_fields_are_escaped():
+    """Test that label and annotation values cannot inject Telegram HTML."""
+    receiver = _receiver()
+    alert = {
+        'status': 'resolved',
+        'labels': {'alertname': 'Disk<b>Full</b>', 'instance': 'db&cache:9100'},
+        'annotations': {'summary': 'usage > 90% on <sda>'}
+    }
+
+    text = receiver._format_single_alert(alert)
+
+    assert text.startswith("🟢 <b>Disk&lt;b&gt;Full&lt;/b&gt;</b> [RESOLVED]\n")
+    assert "Instance: <code>db&amp;cache:9100</code>" in text
+    assert text.endswith("usage &gt; 90% on &lt;sda&gt;")
+
+
+def test_unknown_status_renders_as_firing():
+    """Test that a missing or unknown status is shown as firing."""
+    receiver = _receiver()
+
+    for alert in ({'labels': {'alertname': 'A'}}, {'status': 'pending', 'labels': {'alertname': 'A'}}):
+        assert receiver._format_single_alert(alert).startswith("🔴 <b>A</b> [FIRING]")
+
+    assert _format_alert_cached('A', 'i', 's', None) == _format_alert_cached('A', 'i', 's', 'firing')
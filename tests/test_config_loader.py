@@ -18,13 +18,78 @@ def test_config_loader_basic():
     pass
 
 
-def test_env_var_resolution():
+def _write_config(tmp_path: Path, content: str) -> Path:
+    """Write a YAML config file into a temporary directory."""
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text(content)
+    return config_file
+
+
+def test_env_var_resolution(tmp_path, monkeypatch):
     """Test environment variable resolution."""
-    # This is a placeholder test
-    pass
+    monkeypatch.setenv("TEST_BOT_TOKEN", "secret")
+    config_file = _write_config(tmp_path, 'telegram:\n  bot_token: "${TEST_BOT_TOKEN}"\n')
+
+    config = ConfigLoader(str(config_file))
+
+    assert config.get_telegram_token() == "secret"
+
+
+def test_env_var_resolution_inside_string(tmp_path, monkeypatch):
+    """Test several environment variables embedded in one value."""
+    monkeypatch.setenv("TEST_PROM_HOST", "prometheus")
+    monkeypatch.setenv("TEST_PROM_PORT", "9090")
+    config_file = _write_config(
+        tmp_path, 'prometheus:\n  url: "http://${TEST_PROM_HOST}:${TEST_PROM_PORT}"\n'
+    )
+
+    config = ConfigLoader(str(config_file))
+
+    assert config.get_prometheus_url() == "http://prometheus:9090"
+
 
+def test_env_var_resolution_missing(tmp_path, monkeypatch):
+    """Test that an unset environment variable raises an error."""
+    monkeypatch.delenv("TEST_MISSING_VAR", raising=False)
+    config_file = _write_config(tmp_path, 'grafana:\n  api_token: "${TEST_MISSING_VAR}"\n')
 
-def test_get_with_dot_notation():
+    with pytest.raises(ValueError, match="TEST_MISSING_VAR"):
+        ConfigLoader(str(config_file))
+
+
+def test_get_with_dot_notation(tmp_path):
     """Test getting config values with dot notation."""
-    # This is a placeholder test
-    pass
+    config_file = _write_config(
+        tmp_path,
+        "telegram:\n"
+        "  authorized_users:\n"
+        "    - 1\n"
+        "    - 2\n"
+        "alertmanager:\n"
+        "  webhook_port: 9200\n"
+    )
+
+    config = ConfigLoader(str(config_file))
+
+    assert config.get('alertmanager.webhook_port') == 9200
+    assert config.get('alertmanager') == {'webhook_port': 9200}
+    assert config.get('alertmanager.webhook_path', '/alerts') == '/alerts'
+    assert config.get('alertmanager.webhook_port.missing') is None
+    assert config.get_authorized_users() == frozenset({1, 2})
+
+
+def test_webhook_config(tmp_path):
+    """Test that alert settings are passed on to the webhook receiver."""
+    config_file = _write_config(
+        tmp_path,
+        "alerts:\n"
+        "  aggregation_window: 5\n"
+        "  drain_timeout: 3\n"
+    )
+
+    webhook = ConfigLoader(str(config_file)).get_webhook_config()
+
+    assert webhook['max_queue_time'] == 5
+    assert webhook['drain_timeout'] == 3
+    assert webhook['max_batch_size'] == 50
+    assert webhook['path'] == '/alerts'
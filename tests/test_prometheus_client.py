@@ -0,0 +1,207 @@
+"""Tests for prometheus_client module."""
+
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+import sys
+
+import aiohttp
+import pytest
+from yarl import URL
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import prometheus_client
+from prometheus_client import MAX_RETRIES, PrometheusClient, STATUS_CACHE_TTL
+
+
+def _vector(*series) -> dict:
+    """Build an instant query result from (labels, value) pairs."""
+    return {
+        'resultType': 'vector',
+        'result': [
+            {'metric': labels, 'value': [1700000000.0, str(value)]}
+            for labels, value in series
+        ]
+    }
+
+
+def test_memory_usage_from_single_query(monkeypatch):
+    """Test that total and available memory are read from one query result."""
+    client = PrometheusClient("http://prometheus:9090")
+    queries = []
+    labels = {'instance': 'node1:9100', 'job': 'node'}
+
+    async def fake_query(query):
+        queries.append(query)
+        return _vector(
+            ({'__name__': 'node_memory_MemTotal_bytes', **labels}, 8 * 1024**3),
+            ({'__name__': 'node_memory_MemAvailable_bytes', **labels}, 2 * 1024**3),
+        )
+
+    monkeypatch.setattr(client, 'query', fake_query)
+
+    memory = asyncio.run(client._get_memory_usage())
+
+    assert len(queries) == 1
+    assert '__name__=~' in queries[0]
+    assert memory == {
+        'total_gb': 8.0,
+        'used_gb': 6.0,
+        'available_gb': 2.0,
+        'usage_percent': 75.0
+    }
+
+
+def test_memory_usage_missing_metric(monkeypatch):
+    """Test that memory usage is unavailable without both metrics."""
+    client = PrometheusClient("http://prometheus:9090")
+
+    async def fake_query(query):
+        return _vector(({'__name__': 'node_memory_MemTotal_bytes', 'instance': 'node1:9100'}, 1024**3))
+
+    monkeypatch.setattr(client, 'query', fake_query)
+
+    assert asyncio.run(client._get_memory_usage()) is None
+
+
+def _stub_fetch(client, monkeypatch, status: dict) -> list:
+    """Replace the status fetch with a slow stub and count its calls."""
+    calls = []
+
+    async def fake_fetch():
+        calls.append(None)
+        await asyncio.sleep(0.01)
+        return dict(status)
+
+    monkeypatch.setattr(client, '_fetch_server_status', fake_fetch)
+    return calls
+
+
+def _fake_clock(monkeypatch) -> list:
+    """Drive the client's monotonic clock by hand, leaving asyncio's alone."""
+    now = [1000.0]
+    monkeypatch.setattr(prometheus_client, 'time', SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def test_server_status_is_cached(monkeypatch):
+    """Test that concurrent and repeated calls share one fetch within the TTL."""
+    client = PrometheusClient("http://prometheus:9090")
+    calls = _stub_fetch(client, monkeypatch, {
+        'cpu_usage': 12.5, 'memory_usage': None, 'disk_usage': None, 'network_traffic': None
+    })
+    now = _fake_clock(monkeypatch)
+
+    async def run():
+        concurrent = await asyncio.gather(*(client.get_server_status() for _ in range(5)))
+        assert len(calls) == 1
+        assert all(status is concurrent[0] for status in concurrent)
+
+        now[0] += STATUS_CACHE_TTL / 2
+        assert await client.get_server_status() is concurrent[0]
+        assert len(calls) == 1
+
+        now[0] += STATUS_CACHE_TTL
+        assert await client.get_server_status() is not concurrent[0]
+        assert len(calls) == 2
+
+    asyncio.run(run())
+
+
+def test_failed_server_status_is_not_cached(monkeypatch):
+    """Test that a status without metrics is only shared by concurrent callers."""
+    client = PrometheusClient("http://prometheus:9090")
+    calls = _stub_fetch(client, monkeypatch, {
+        'cpu_usage': None, 'memory_usage': None, 'disk_usage': None, 'network_traffic': None
+    })
+    now = _fake_clock(monkeypatch)
+
+    async def run():
+        await asyncio.gather(*(client.get_server_status() for _ in range(5)))
+        assert len(calls) == 1
+
+        now[0] += 0.1
+        await client.get_server_status()
+        assert len(calls) == 2
+
+    asyncio.run(run())
+
+
+class _FakeResponse:
+    """Response with a fixed status and JSON body."""
+
+    def __init__(self, url: str, status: int = 200, body: bytes = b'{"status":"success","data":{"result":[]}}'):
+        self.url = url
+        self.status = status
+        self.body = body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            request_info = aiohttp.RequestInfo(URL(self.url), 'GET', {}, URL(self.url))
+            raise aiohttp.ClientResponseError(request_info, (), status=self.status)
+
+    async def read(self) -> bytes:
+        return self.body
+
+
+class _FakeSession:
+    """Session whose GET requests play back a list of outcomes."""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.attempts = 0
+
+    def get(self, url, **kwargs):
+        self.attempts += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return _FakeResponse(url, status=outcome)
+
+
+def _client_with_session(monkeypatch, outcomes) -> tuple:
+    """Create a client whose requests use a fake session, without backoff delays."""
+    client = PrometheusClient("http://prometheus:9090")
+    session = _FakeSession(outcomes)
+    monkeypatch.setattr(client, '_get_session', lambda: session)
+    monkeypatch.setattr(prometheus_client, 'RETRY_BACKOFF', 0)
+    return client, session
+
+
+def test_query_retries_connection_errors(monkeypatch):
+    """Test that transient connection failures are retried until a request succeeds."""
+    client, session = _client_with_session(monkeypatch, [
+        aiohttp.ClientConnectionError("reset"),
+        aiohttp.ClientConnectionError("reset"),
+        200,
+    ])
+
+    assert asyncio.run(client.query('up')) == {'result': []}
+    assert session.attempts == 3
+
+
+def test_query_gives_up_after_max_retries(monkeypatch):
+    """Test that a query fails once every attempt has failed."""
+    client, session = _client_with_session(
+        monkeypatch, [aiohttp.ClientConnectionError("refused")] * (MAX_RETRIES + 1)
+    )
+
+    assert asyncio.run(client.query('up')) is None
+    assert session.attempts == MAX_RETRIES + 1
+
+
+@pytest.mark.parametrize("status", [400, 503])
+def test_query_does_not_retry_http_errors(monkeypatch, status):
+    """Test that an HTTP error response is not retried."""
+    client, session = _client_with_session(monkeypatch, [status, 200])
+
+    assert asyncio.run(client.query('up')) is None
+    assert session.attempts == 1
@@ -0,0 +1,93 @@
+"""Tests for telegram_bot module."""
+
+import asyncio
+import html
+import re
+from pathlib import Path
+from types import SimpleNamespace
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import telegram_bot
+from telegram_bot import MonitoringBot, PER_CHAT_INTERVAL, _split_message
+
+
+def _assert_valid_html(chunk: str):
+    """Assert that tags are balanced and no entity is cut in a chunk."""
+    stack = []
+    for closing, name in re.findall(r'<(/?)(\w+)[^>]*>', chunk):
+        if closing:
+            assert stack and stack.pop() == name, chunk
+        else:
+            stack.append(name)
+    assert not stack, chunk
+
+    # Every & must start a complete entity, and no entity tail is left over
+    text = re.sub(r'<[^>]*>', '', chunk)
+    assert re.fullmatch(r'([^&;]|&\w+;)*', text), chunk
+
+
+def test_split_message_at_limit():
+    """Test that a message of exactly the limit is kept whole."""
+    message = "a" * 5 + "\n" + "b" * 4
+
+    assert _split_message(message, limit=10) == [message]
+    assert _split_message(message + "b", limit=10) == ["a" * 5, "b" * 5]
+
+
+def test_split_message_keeps_lines_whole():
+    """Test that lines are never cut when they fit into a chunk."""
+    lines = [f"line {i}" for i in range(20)]
+
+    chunks = _split_message("\n".join(lines), limit=30)
+
+    assert all(len(chunk) <= 30 for chunk in chunks)
+    assert "\n".join(chunks).split("\n") == lines
+
+
+def test_split_message_line_over_limit():
+    """Test that a single over-long line is cut into chunks within the limit."""
+    chunks = _split_message("x" * 25, limit=10)
+
+    assert chunks == ["x" * 10, "x" * 10, "x" * 5]
+
+
+def test_split_message_keeps_html_balanced():
+    """Test that cuts of an over-long line never break tags or entities."""
+    summary = html.escape("disk <sda> & <sdb> full " * 20)
+    message = f"🔴 <b>DiskFull</b> [FIRING]\n   Instance: <code>{summary}</code>\n📊 Total: 1 alert(s)"
+
+    for limit in (40, 57, 100):
+        chunks = _split_message(message, limit=limit)
+
+        assert all(len(chunk) <= limit for chunk in chunks)
+        for chunk in chunks:
+            _assert_valid_html(chunk)
+
+        # Only the tags added at the cuts differ from the original text
+        text = "".join(re.sub(r'</?code>', '', chunk) for chunk in chunks)
+        assert text.replace("\n", "") == re.sub(r'</?code>', '', message).replace("\n", "")
+
+
+def test_send_alert_paces_chunks(monkeypatch):
+    """Test that chunks to one user are spaced by PER_CHAT_INTERVAL."""
+    events = []
+
+    async def send_message(chat_id, text, parse_mode):
+        events.append(('send', text))
+
+    async def sleep(delay):
+        events.append(('sleep', delay))
+
+    monkeypatch.setattr(telegram_bot.asyncio, 'sleep', sleep)
+    bot = SimpleNamespace(application=SimpleNamespace(bot=SimpleNamespace(send_message=send_message)))
+
+    asyncio.run(MonitoringBot.send_alert(bot, 42, ["one", "two", "three"]))
+
+    assert events == [
+        ('send', "one"), ('sleep', PER_CHAT_INTERVAL),
+        ('send', "two"), ('sleep', PER_CHAT_INTERVAL),
+        ('send', "three"),
+    ]
@@ -0,0 +1,197 @@
+"""Tests for user_manager module."""
+
+import asyncio
+import atexit
+import json
+import os
+import pytest
+from pathlib import Path
+import sys
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from user_manager import UserManager
+
+
+@pytest.fixture
+def storage_path(tmp_path):
+    """Path of the user storage file inside a temporary directory."""
+    return tmp_path / "data" / "authorized_users.jsonl"
+
+
+@pytest.fixture
+def make_manager(storage_path):
+    """Build managers on the temporary storage and close them on teardown."""
+    managers = []
+
+    def make(authorized_users=(), **kwargs) -> UserManager:
+        manager = UserManager(authorized_users, str(storage_path), **kwargs)
+        managers.append(manager)
+        return manager
+
+    yield make
+    for manager in managers:
+        manager.close()
+
+
+def _stored_users(storage_path: Path) -> set:
+    """Read the user IDs persisted in the storage file."""
+    manager = UserManager([], str(storage_path))
+    manager.close()
+    return set(manager.get_all_users())
+
+
+def test_add_and_remove_user(storage_path, make_manager):
+    """Test that changes are kept in memory and persisted."""
+    manager = make_manager([1])
+
+    assert manager.add_user(2)
+    assert not manager.add_user(2)
+    assert manager.is_authorized(2)
+    assert manager.remove_user(1)
+    assert not manager.remove_user(1)
+    assert not manager.is_authorized(1)
+
+    manager.flush(force=True)
+    assert _stored_users(storage_path) == {2}
+
+
+def test_close_releases_exit_hook(storage_path, monkeypatch):
+    """Test that a closed manager is no longer referenced by atexit."""
+    registered = []
+    monkeypatch.setattr(atexit, 'register', registered.append)
+    monkeypatch.setattr(atexit, 'unregister', registered.remove)
+
+    manager = UserManager([], str(storage_path), flush_interval=3600)
+    assert registered == [manager.close]
+    manager.add_user(1)
+    manager.add_user(2)
+
+    manager.close()
+    assert registered == []
+    assert _stored_users(storage_path) == {1, 2}
+
+
+def test_writes_are_debounced(storage_path, make_manager):
+    """Test that changes within the flush interval are written together."""
+    manager = make_manager(flush_interval=3600)
+
+    manager.add_user(1)
+    manager.add_user(2)
+    assert _stored_users(storage_path) == {1}
+
+    assert manager.flush(force=True)
+    assert _stored_users(storage_path) == {1, 2}
+    assert not manager.flush(force=True)
+
+
+def test_batched_writes_once(storage_path, make_manager):
+    """Test that a batch of changes is written on exit of the block."""
+    manager = make_manager()
+
+    with manager.batched():
+        for user_id in range(10):
+            manager.add_user(user_id)
+        assert not manager.snapshot_path.exists()
+
+    assert _stored_users(storage_path) == set(range(10))
+
+
+def test_save_is_offloaded_in_event_loop(storage_path, make_manager):
+    """Test that changes made on an event loop are coalesced into one background write."""
+    manager = make_manager(flush_interval=0)
+
+    async def change_users():
+        for user_id in range(5):
+            manager.add_user(user_id)
+        # Nothing is written until the loop gets to run the scheduled save
+        assert not manager.snapshot_path.exists()
+        await manager.drain()
+
+    asyncio.run(change_users())
+
+    assert _stored_users(storage_path) == set(range(5))
+
+
+def test_users_are_loaded_from_storage(make_manager):
+    """Test that a new instance picks up persisted users."""
+    manager = make_manager([1])
+    manager.add_user(2)
+    manager.flush(force=True)
+
+    reloaded = make_manager([3])
+
+    assert set(reloaded.get_all_users()) == {1, 2, 3}
+
+
+def test_snapshot_survives_short_writes(storage_path, make_manager, monkeypatch):
+    """Test that a snapshot written in several short writes is complete."""
+    write = os.write
+    monkeypatch.setattr(os, 'write', lambda fd, data: write(fd, bytes(data)[:3]))
+
+    manager = make_manager()
+    with manager.batched():
+        for user_id in (1, 2, 3):
+            manager.add_user(user_id)
+
+    assert manager.snapshot_path.stat().st_size == 3 * 8
+    assert _stored_users(storage_path) == {1, 2, 3}
+
+
+def test_construction_does_not_write(storage_path, make_manager):
+    """Test that reloading unchanged users leaves storage untouched."""
+    manager = make_manager([1])
+    manager.add_user(2)
+    manager.flush(force=True)
+    mtime = manager.snapshot_path.stat().st_mtime_ns
+
+    for _ in range(3):
+        reloaded = make_manager([1])
+        assert not reloaded.flush(force=True)
+
+    assert manager.snapshot_path.stat().st_mtime_ns == mtime
+    assert not storage_path.exists()
+
+
+def test_log_is_compacted(storage_path, make_manager):
+    """Test that the append-only log is rewritten once it grows too long."""
+    manager = make_manager(flush_interval=0)
+
+    for _ in range(5):
+        manager.add_user(1)
+        manager.remove_user(1)
+    manager.add_user(2)
+
+    assert len(storage_path.read_text().splitlines()) <= 2
+    assert _stored_users(storage_path) == {2}
+
+
+def test_log_is_replayed_on_snapshot(storage_path, make_manager):
+    """Test that changes logged after the binary snapshot are applied on load."""
+    manager = make_manager(flush_interval=0)
+    with manager.batched():
+        for user_id in (1, 2, 3):
+            manager.add_user(user_id)
+
+    assert manager.snapshot_path.stat().st_size == 3 * 8
+
+    manager.remove_user(2)
+    assert storage_path.read_text().splitlines() == ['{"op":"del","id":2}']
+    assert _stored_users(storage_path) == {1, 3}
+
+    export_path = storage_path.parent / "users.json"
+    manager.export_json(str(export_path))
+    assert json.loads(export_path.read_text()) == [1, 3]
+
+
+def test_legacy_json_is_migrated(storage_path, make_manager):
+    """Test that users stored in the former JSON list format are kept."""
+    storage_path.parent.mkdir(parents=True)
+    storage_path.with_suffix('.json').write_text(json.dumps([4, 5]))
+
+    manager = make_manager()
+    assert set(manager.get_all_users()) == {4, 5}
+
+    manager.flush(force=True)
+    assert _stored_users(storage_path) == {4, 5}